@@ -1,25 +1,112 @@
+import os
+import types
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 from config import ConfigurationManager
 from data_handler import DataHandler
-from strategy_engine import StrategyEngine
+from strategy_engine import Signal, StrategyEngine
 from portfolio_manager import PortfolioManager
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the simulation runs as plain Python,
+    # which is slower but produces identical results.
+    def njit(*args, **kwargs):
+        def decorate(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return decorate
+
+
+# For backtesting, we mock the sentiment. A future enhancement could be to use
+# a historical sentiment data source. Read-only so it can be shared freely.
+_MOCK_SENTIMENT = types.MappingProxyType({'sentiment_score': 0.1, 'sentiment_label': 'NEUTRAL'})
+
+
+@njit(cache=True)
+def _simulate(close, stop_loss_arr, buy_signal, sell_signal, balance, risk_per_trade_percent):
+    """
+    The core backtest state machine (entry, stop-loss, exit, PnL compounding)
+    as a pure function of NumPy arrays so numba can compile it to machine code.
+    Returns (entry_idx, exit_idx, pnls, final_balance).
+    """
+    n = close.shape[0]
+    entry_idx = np.empty(n, np.int64)
+    exit_idx = np.empty(n, np.int64)
+    pnls = np.empty(n, np.float64)
+    num_trades = 0
+
+    in_position = False
+    entry_price = 0.0
+    stop_loss_price = 0.0
+    position_size = 0.0
+    entry_i = 0
+
+    for i in range(n):
+        price = close[i]
+
+        # Check for stop-loss first
+        if in_position and price <= stop_loss_price:
+            pnl = (price - entry_price) * position_size
+            balance += pnl
+            entry_idx[num_trades] = entry_i
+            exit_idx[num_trades] = i
+            pnls[num_trades] = pnl
+            num_trades += 1
+            in_position = False
+            continue
+
+        if buy_signal[i] and not in_position:
+            stop = stop_loss_arr[i]
+            # Same sizing rule as PortfolioManager.calculate_position_size,
+            # inlined so the whole loop stays inside compiled code.
+            if stop < price:
+                capital_to_risk = balance * risk_per_trade_percent / 100.0
+                position_size = capital_to_risk / (price - stop)
+                if position_size > 0.0:
+                    in_position = True
+                    entry_price = price
+                    stop_loss_price = stop
+                    entry_i = i
+
+        elif sell_signal[i] and in_position:
+            pnl = (price - entry_price) * position_size
+            balance += pnl
+            entry_idx[num_trades] = entry_i
+            exit_idx[num_trades] = i
+            pnls[num_trades] = pnl
+            num_trades += 1
+            in_position = False
+
+    return entry_idx[:num_trades], exit_idx[:num_trades], pnls[:num_trades], balance
+
 class Backtester:
     """
     Simulates a trading strategy on historical data to evaluate performance.
     """
-    def __init__(self, config: ConfigurationManager, strategy_config: dict, start_date: str):
+    def __init__(self, config: ConfigurationManager, strategy_config: dict, start_date: str, data: pd.DataFrame = None):
         self.config = config
         self.strategy_config = strategy_config
         self.start_date = start_date
-        
-        self.data_handler = DataHandler(config)
+
+        # Pre-loaded data lets parameter sweeps share one download across
+        # runs; only connect to the exchange when we actually need to fetch.
+        self.data = data
+        self.data_handler = DataHandler(config) if data is None else None
         self.strategy_engine = StrategyEngine()
         # Use a fresh PortfolioManager instance for each backtest run
-        self.portfolio_manager = PortfolioManager(config)
-        
-        self.trades = []
+        self.portfolio_manager = PortfolioManager(config, verbose=False)
+
+        # Trade log as struct-of-arrays: parallel entry/exit bar indices and
+        # PnL values, instead of a list of per-trade dicts.
+        self.entry_idx = np.empty(0, dtype=np.int64)
+        self.exit_idx = np.empty(0, dtype=np.int64)
+        self.pnl_array = np.empty(0, dtype=np.float64)
+        self.timestamps = np.empty(0, dtype='datetime64[ns]')
         
     def run(self):
         """
@@ -31,57 +118,45 @@ class Backtester:
         print(f"Start Date: {self.start_date}")
         print("="*63 + "\n")
 
-        # 1. Fetch historical data
-        historical_data = self.data_handler.fetch_historical_data(self.start_date)
+        # 1. Fetch historical data (unless it was supplied up front)
+        if self.data is not None:
+            historical_data = self.data
+        else:
+            historical_data = self.data_handler.fetch_historical_data(self.start_date)
         if historical_data.empty:
             print("Could not fetch historical data. Aborting backtest.")
             return
             
-        # 2. Add technical indicators to the entire dataset
-        data_with_indicators = self.strategy_engine.add_indicators(historical_data, self.strategy_config)
-
-        # 3. Loop through the data and simulate trading
-        in_position = False
-        entry_price = 0.0
-        stop_loss_price = None
-        position_size = 0.0
-        entry_time = None
-
-        for i, row in data_with_indicators.iterrows():
-            # NOTE: For backtesting, we mock the sentiment. A future enhancement could be
-            # to use a historical sentiment data source.
-            mock_sentiment = {'sentiment_score': 0.1, 'sentiment_label': 'NEUTRAL'}
-
-            # Check for stop-loss first
-            if in_position and row['close'] <= stop_loss_price:
-                exit_price = row['close']
-                self.portfolio_manager.update_balance_after_trade(exit_price, entry_price, position_size)
-                self.trades.append({'entry_date': entry_time, 'exit_date': row['timestamp'], 'pnl': (exit_price - entry_price) * position_size})
-                in_position = False
-                continue
-
-            # Generate signal based on data up to the current point
-            signal_details = self.strategy_engine.generate_signal(data_with_indicators.iloc[:i+1], self.strategy_config, mock_sentiment)
-            signal = signal_details.get('signal')
-
-            # Act on the signal
-            if signal == 'buy' and not in_position:
-                entry_price = row['close']
-                entry_time = row['timestamp']
-                stop_loss_price = signal_details.get('stop_loss')
-                if not stop_loss_price: continue
-
-                position_size = self.portfolio_manager.calculate_position_size(entry_price, stop_loss_price)
-                if position_size > 0:
-                    in_position = True
+        # 2-3. Indicators and signals in one fused kernel sweep: the OHLCV
+        # arrays are read once and the per-bar signal plus stop-loss come out
+        # directly, with no intermediate SMA/ATR columns materialized. Bars
+        # still inside the indicator warm-up come out HOLD (or carry a NaN
+        # stop), so no leading rows need to be trimmed.
+        arrays = {
+            col: historical_data[col].to_numpy()
+            for col in ('timestamp', 'close', 'low', 'high')
+        }
+
+        signals, stop_loss_arr = self.strategy_engine.generate_signals_and_stops(
+            arrays['high'], arrays['low'], arrays['close'],
+            self.strategy_config, _MOCK_SENTIMENT
+        )
+        buy_signal = signals == np.int8(Signal.BUY)
+        sell_signal = signals == np.int8(Signal.SELL)
 
-            elif signal == 'sell' and in_position:
-                exit_price = row['close']
-                self.portfolio_manager.update_balance_after_trade(exit_price, entry_price, position_size)
-                self.trades.append({'entry_date': entry_time, 'exit_date': row['timestamp'], 'pnl': (exit_price - entry_price) * position_size})
-                in_position = False
+        close = arrays['close']
+        timestamps = arrays['timestamp']
 
-        # 4. Generate a final report
+        # 4. Run the compiled simulation loop; the returned trade arrays are
+        # kept as-is, entry/exit dates are just timestamps[entry_idx] etc.
+        self.entry_idx, self.exit_idx, self.pnl_array, final_balance = _simulate(
+            close, stop_loss_arr, buy_signal, sell_signal,
+            self.portfolio_manager.balance, self.config.risk_per_trade_percent
+        )
+        self.portfolio_manager.balance = final_balance
+        self.timestamps = timestamps
+
+        # 5. Generate a final report
         self._generate_report()
 
     def _generate_report(self):
@@ -89,19 +164,21 @@ class Backtester:
         Calculates and prints key performance metrics of the backtest.
         """
         print("\n" + "="*25 + " BACKTEST REPORT " + "="*24)
-        if not self.trades:
+        num_trades = len(self.pnl_array)
+        if num_trades == 0:
             print("No trades were executed during the backtest period.")
             return
 
-        pnl_values = [trade['pnl'] for trade in self.trades]
-        wins = [p for p in pnl_values if p > 0]
-        losses = [p for p in pnl_values if p < 0]
+        # Boolean masks over the contiguous PnL array replace the three
+        # Python-level passes over the old list-of-dicts trade log.
+        pnl = self.pnl_array
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
 
         total_return = (self.portfolio_manager.balance / self.portfolio_manager.initial_balance - 1) * 100
-        num_trades = len(self.trades)
-        win_rate = (len(wins) / num_trades) * 100 if num_trades > 0 else 0
-        avg_win = np.mean(wins) if wins else 0
-        avg_loss = np.mean(losses) if losses else 0
+        win_rate = (wins.size / num_trades) * 100
+        avg_win = wins.mean() if wins.size else 0.0
+        avg_loss = losses.mean() if losses.size else 0.0
         reward_risk_ratio = abs(avg_win / avg_loss) if avg_loss != 0 else np.inf
         
         print(f"  Ending Balance:       ${self.portfolio_manager.balance:,.2f}")
@@ -113,3 +190,47 @@ class Backtester:
         print(f"  Reward/Risk Ratio:    {reward_risk_ratio:.2f}")
         print("="*63 + "\n")
 
+
+# Historical data for the current sweep, set once per worker process by
+# _init_grid_worker. A module global so job tuples stay tiny: shipping the
+# DataFrame inside each job would re-pickle the whole history per chunk.
+_GRID_DATA = None
+
+
+def _init_grid_worker(data: pd.DataFrame):
+    global _GRID_DATA
+    _GRID_DATA = data
+
+
+def _run_grid_one(args) -> dict:
+    """
+    Worker for run_grid: runs a single backtest and returns a summary dict.
+    """
+    config, strategy_config, start_date = args
+    backtester = Backtester(config, strategy_config, start_date, data=_GRID_DATA)
+    backtester.run()
+    return {
+        'params': strategy_config['params'],
+        'final_balance': backtester.portfolio_manager.balance,
+        'num_trades': len(backtester.pnl_array),
+    }
+
+
+def run_grid(config: ConfigurationManager, strategy_configs: list, start_date: str, data: pd.DataFrame = None) -> list:
+    """
+    Runs one backtest per strategy configuration across all CPU cores.
+
+    Individual backtests are path-dependent and must run sequentially, but a
+    parameter sweep is embarrassingly parallel. The historical data should be
+    fetched once by the caller and passed in so workers don't re-download it;
+    each worker then receives it exactly once via the pool initializer
+    instead of once per job chunk.
+    """
+    if data is None:
+        data = DataHandler(config).fetch_historical_data(start_date)
+
+    jobs = [(config, sc, start_date) for sc in strategy_configs]
+    with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                             initializer=_init_grid_worker, initargs=(data,)) as executor:
+        return list(executor.map(_run_grid_one, jobs, chunksize=4))
+
@@ -12,6 +12,9 @@ class ConfigurationManager:
         # --- General Settings ---
         self.symbol = 'BTC/USDT'
         self.timeframe = '1h'
+        # Stream candles over a persistent websocket when the installed ccxt
+        # supports it; the Trader falls back to REST polling otherwise.
+        self.use_websocket = True
         
         # --- Portfolio & Risk ---
         self.capital_base = 100.0
@@ -1,39 +1,140 @@
+import asyncio
+import logging
+import threading
+import uuid
+
+import ccxt
 from config import ConfigurationManager
 
+try:
+    import ccxt.pro
+    _HAS_CCXT_PRO = True
+except ImportError:
+    # ccxt.pro is optional: without it orders go over REST.
+    _HAS_CCXT_PRO = False
+
+logger = logging.getLogger(__name__)
+
 class ExecutionHandler:
     """
     Handles the execution of trades on the exchange.
     Can operate in 'dry_run' or 'live' mode.
     """
+    # Binance acknowledges websocket orders well under a second; anything
+    # slower means the connection is sick and REST should take over.
+    WS_ORDER_TIMEOUT_SECONDS = 5.0
+
     def __init__(self, config: ConfigurationManager, exchange):
         self.config = config
         self.exchange = exchange
+        # Long-lived websocket client plus its event loop on a background
+        # thread, created lazily on the first live order so dry runs never
+        # pay for either.
+        self._ws_exchange = None
+        self._ws_loop = None
+        self._ws_unsupported = False
+
+    def _ensure_ws(self):
+        """
+        Returns the persistent websocket client, or None when the installed
+        ccxt cannot place orders over a websocket for this exchange.
+        """
+        if self._ws_unsupported or not _HAS_CCXT_PRO or not hasattr(ccxt.pro, self.exchange.id):
+            return None
+        if self._ws_exchange is None:
+            # Probe the capability before spawning anything: an exchange that
+            # cannot place websocket orders must not leave an event-loop
+            # thread running forever. The probe never opens a connection.
+            client = getattr(ccxt.pro, self.exchange.id)({
+                'apiKey': self.config.api_key,
+                'secret': self.config.api_secret,
+                'enableRateLimit': True,
+            })
+            if not client.has.get('createOrderWs'):
+                self._ws_unsupported = True
+                return None
+            self._ws_exchange = client
+            self._ws_loop = asyncio.new_event_loop()
+            threading.Thread(target=self._ws_loop.run_forever, daemon=True).start()
+        return self._ws_exchange
+
+    def _find_order(self, client_order_id: str, symbol: str):
+        """
+        REST lookup of an order by its client id. Returns None only when the
+        exchange positively reports the order does not exist; any other
+        failure propagates, because "could not check" must not be mistaken
+        for "was not placed".
+        """
+        try:
+            return self.exchange.fetch_order(None, symbol, params={'clientOrderId': client_order_id})
+        except ccxt.OrderNotFound:
+            return None
+
+    def _place_market_order(self, order_type: str, amount: float, symbol: str):
+        """
+        Places a market order over the persistent websocket when supported —
+        no per-order HTTPS/TLS handshake — with REST as the fallback.
+
+        A timed-out or failed websocket ack does NOT mean the order was not
+        placed: the in-flight request can still execute on the exchange after
+        the window, and blindly resubmitting over REST would double the
+        position. Every order therefore carries a client id; when the ack is
+        lost, the exchange is asked over REST whether the order landed, and
+        only a confirmed miss is resubmitted — under the same client id, so
+        exchanges that enforce id uniqueness reject a late double-fill even
+        if the websocket order arrives after the check.
+        """
+        ws = self._ensure_ws()
+        if ws is None:
+            return self.exchange.create_order(symbol, 'market', order_type, amount)
+
+        client_order_id = 'swt-' + uuid.uuid4().hex[:20]
+        params = {'clientOrderId': client_order_id}
+        try:
+            future = asyncio.run_coroutine_threadsafe(
+                ws.create_order_ws(symbol, 'market', order_type, amount, params=params),
+                self._ws_loop,
+            )
+        except Exception as e:
+            # Scheduling on the loop failed: nothing was sent, REST is safe.
+            logger.warning("Websocket order failed before submission (%s); falling back to REST.", e)
+            return self.exchange.create_order(symbol, 'market', order_type, amount, params=params)
+
+        try:
+            return future.result(timeout=self.WS_ORDER_TIMEOUT_SECONDS)
+        except TimeoutError:
+            future.cancel()
+            logger.warning("Websocket order ack timed out; checking the exchange before any retry.")
+        except Exception as e:
+            logger.warning("Websocket order failed (%s); checking the exchange before any retry.", e)
+
+        order = self._find_order(client_order_id, symbol)
+        if order is not None:
+            logger.warning("Websocket order %s reached the exchange despite the lost ack; not resubmitting.",
+                           client_order_id)
+            return order
+        logger.warning("Order %s is not on the exchange; resubmitting over REST.", client_order_id)
+        return self.exchange.create_order(symbol, 'market', order_type, amount, params=params)
 
     def execute_order(self, order_type: str, amount: float, symbol: str):
         """
         Sends a market order to the exchange.
         """
-        print("-" * 20 + " EXECUTION " + "-" * 20)
-        print(f"Requesting to {order_type.upper()} {amount:.6f} {symbol}")
-        
+        logger.info("Requesting to %s %.6f %s", order_type.upper(), amount, symbol)
+
         if self.config.dry_run:
-            print("--- DRY RUN MODE ---")
-            print(f"Order would be sent to the exchange.")
+            logger.info("DRY RUN MODE: order would be sent to the exchange.")
             # In dry run mode, we always simulate a successful order
             return True
         else:
             try:
-                # This is where you would place the actual exchange API call for a market order
-                # For example:
-                # order = self.exchange.create_market_order(symbol, order_type, amount)
-                print("--- LIVE MODE ---")
-                print("Live order execution is a placeholder. Simulating success for now.")
-                # print("Exchange response:", order) # Log the result from the exchange
-                
+                order = self._place_market_order(order_type, amount, symbol)
+                logger.info("LIVE MODE: order placed. Exchange order id: %s", order.get('id'))
+
                 # Placeholder for actual execution result validation
                 # In a real system, you would check the order status from the exchange response.
                 return True
             except Exception as e:
-                print(f"An error occurred during live order execution: {e}")
+                logger.error("An error occurred during live order execution: %s", e)
                 return False
 
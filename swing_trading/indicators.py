@@ -0,0 +1,333 @@
+from collections import deque, namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the kernels run as plain Python,
+    # which is slower but produces identical results.
+    def njit(*args, **kwargs):
+        def decorate(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return decorate
+
+# Standard Fibonacci retracement ratios, kept as a module-level constant so a
+# single broadcasted expression computes all levels with no per-level Python
+# arithmetic or dict construction.
+_FIB_RATIOS = np.array([0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0], dtype=np.float64)
+_FIB_NAMES = ('0.0%', '23.6%', '38.2%', '50.0%', '61.8%', '78.6%', '100.0%')
+
+
+def fibonacci_retracement(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """
+    Computes the seven Fibonacci retracement levels for a price window.
+
+    Returns the levels as a contiguous float64 array ordered from the window
+    high (0%) down to the window low (100%).
+    """
+    highest = np.max(high)
+    lowest = np.min(low)
+    return highest - (highest - lowest) * _FIB_RATIOS
+
+
+def fibonacci_retracement_labeled(high: np.ndarray, low: np.ndarray) -> dict:
+    """
+    Same levels as fibonacci_retracement, keyed by their percentage labels
+    for callers that want to display them.
+    """
+    return dict(zip(_FIB_NAMES, fibonacci_retracement(high, low)))
+
+
+@njit(cache=True)
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average from a compiled running-sum sweep: add the new
+    value, drop the one leaving the window, divide. One O(n) pass with no
+    intermediate cumsum array; leading entries that lack a full window are
+    NaN, matching the rolling-mean convention. The accumulator is float64
+    regardless of input width, so float32 inputs keep their dtype on output
+    without the running sum losing precision.
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan, values.dtype)
+    if window <= 0 or n < window:
+        return out
+    total = 0.0
+    for i in range(n):
+        total += values[i]
+        if i >= window:
+            total -= values[i - window]
+        if i >= window - 1:
+            out[i] = total / window
+    return out
+
+
+def wma(values: np.ndarray, window: int, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Weighted moving average over a sliding window: a zero-copy strided view
+    of all windows and one BLAS-backed matrix-vector product, instead of a
+    Python-level rolling apply per window. Defaults to the standard linear
+    weights 1..window; pass explicit weights for other shapes.
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan, dtype=values.dtype)
+    if not 0 < window <= n:
+        return out
+    if weights is None:
+        weights = np.arange(1, window + 1, dtype=np.float64)
+    else:
+        weights = np.asarray(weights, dtype=np.float64)
+    windows = sliding_window_view(values, window)
+    out[window - 1:] = windows @ (weights / weights.sum())
+    return out
+
+
+@njit(cache=True)
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponential moving average with alpha = 2/(span+1), seeded from the
+    first value (pandas ewm(adjust=False) convention).
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan, values.dtype)
+    if n == 0 or span <= 0:
+        return out
+    alpha = 2.0 / (span + 1.0)
+    prev = values[0]
+    out[0] = prev
+    for i in range(1, n):
+        prev = alpha * values[i] + (1.0 - alpha) * prev
+        out[i] = prev
+    return out
+
+
+@njit(cache=True)
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Relative Strength Index with Wilder smoothing of the average
+    gains/losses, computed in one pass over the close array.
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan, close.dtype)
+    if n <= period:
+        return out
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        change = close[i] - close[i - 1]
+        if change > 0:
+            avg_gain += change
+        else:
+            avg_loss -= change
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(period, n):
+        if i > period:
+            change = close[i] - close[i - 1]
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        if avg_loss == 0.0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """
+    MACD line, signal line and histogram from three EMA passes.
+    """
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+@njit(cache=True)
+def bollinger_bands(close: np.ndarray, window: int, num_std: float):
+    """
+    Bollinger bands from running sum / sum-of-squares accumulators:
+    returns (middle, upper, lower) bands in a single pass.
+    """
+    n = close.shape[0]
+    mid = np.full(n, np.nan, close.dtype)
+    upper = np.full(n, np.nan, close.dtype)
+    lower = np.full(n, np.nan, close.dtype)
+    if window <= 0 or n < window:
+        return mid, upper, lower
+
+    total = 0.0
+    total_sq = 0.0
+    for i in range(n):
+        value = close[i]
+        total += value
+        total_sq += value * value
+        if i >= window:
+            dropped = close[i - window]
+            total -= dropped
+            total_sq -= dropped * dropped
+        if i >= window - 1:
+            mean = total / window
+            variance = total_sq / window - mean * mean
+            if variance < 0.0:
+                variance = 0.0
+            band = num_std * np.sqrt(variance)
+            mid[i] = mean
+            upper[i] = mean + band
+            lower[i] = mean - band
+    return mid, upper, lower
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    True range as one branchless np.maximum chain over the raw arrays —
+    SIMD-vectorized by NumPy with no temporary DataFrame columns and no
+    per-row Python max, so it stays fast even without numba.
+    """
+    c_prev = np.empty_like(close)
+    c_prev[0] = close[0]
+    c_prev[1:] = close[:-1]
+    tr = np.maximum(np.maximum(high - low, np.abs(high - c_prev)), np.abs(low - c_prev))
+    # The first candle has no previous close; its TR is just the range.
+    tr[0] = high[0] - low[0]
+    return tr
+
+
+@njit(cache=True)
+def _wilder_smooth(tr: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder smoothing of a true-range series: seeded with the simple mean of
+    the first `period` true ranges, then atr = (atr*(n-1) + tr) / n. The
+    recurrence is inherently sequential, so it stays a compiled scalar loop.
+    """
+    n = tr.shape[0]
+    out = np.full(n, np.nan)
+    value = 0.0
+    for i in range(1, period + 1):
+        value += tr[i]
+    value /= period
+    out[period] = value
+    for i in range(period + 1, n):
+        value = (value * (period - 1) + tr[i]) / period
+        out[i] = value
+    return out
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Average True Range: vectorized true range plus the compiled Wilder
+    recurrence.
+    """
+    n = close.shape[0]
+    if n <= period:
+        return np.full(n, np.nan, dtype=close.dtype)
+    tr = np.asarray(true_range(high, low, close), dtype=np.float64)
+    return _wilder_smooth(tr, period).astype(close.dtype, copy=False)
+
+
+IndicatorSnapshot = namedtuple('IndicatorSnapshot', ['sma_short', 'sma_long', 'atr'])
+
+
+class IndicatorState:
+    """
+    Incremental indicator state for live trading.
+
+    A live loop appends one candle per cycle, so recomputing every indicator
+    over the full window is redundant. This keeps running accumulators and
+    updates each indicator in O(1) per candle: SMAs via a bounded deque and
+    running sum, ATR via the Wilder recurrence atr = (atr*(n-1) + tr) / n.
+    Values are NaN until their warm-up window has been seen. Replaying a
+    history through update() yields the same values as the batch kernels.
+    """
+
+    def __init__(self, short_window: int, long_window: int, atr_period: int):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.atr_period = atr_period
+
+        self._short = deque(maxlen=short_window)
+        self._short_sum = 0.0
+        self._long = deque(maxlen=long_window)
+        self._long_sum = 0.0
+
+        self._prev_close = np.nan
+        self._tr_count = 0      # true ranges seen so far (excluding the first candle)
+        self._tr_seed_sum = 0.0
+        self._atr = np.nan
+
+    def _update_sma(self, window: deque, total: float, value: float):
+        if len(window) == window.maxlen:
+            total -= window[0]
+        window.append(value)
+        total += value
+        mean = total / window.maxlen if len(window) == window.maxlen else np.nan
+        return total, mean
+
+    def update(self, high: float, low: float, close: float) -> IndicatorSnapshot:
+        """
+        Folds one new candle into the state and returns the latest values.
+        """
+        self._short_sum, sma_short = self._update_sma(self._short, self._short_sum, close)
+        self._long_sum, sma_long = self._update_sma(self._long, self._long_sum, close)
+
+        # ATR: seed with the simple mean of the first `period` true ranges
+        # (skipping the first candle, which has no previous close), then
+        # switch to the Wilder recurrence. Mirrors the atr() kernel.
+        if not np.isnan(self._prev_close):
+            tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+            self._tr_count += 1
+            if self._tr_count <= self.atr_period:
+                self._tr_seed_sum += tr
+                if self._tr_count == self.atr_period:
+                    self._atr = self._tr_seed_sum / self.atr_period
+            else:
+                self._atr = (self._atr * (self.atr_period - 1) + tr) / self.atr_period
+        self._prev_close = close
+
+        return IndicatorSnapshot(sma_short, sma_long, self._atr)
+
+    def peek(self, high: float, low: float, close: float) -> IndicatorSnapshot:
+        """
+        Returns the snapshot update() would produce for this candle without
+        mutating the state. Used for the still-open candle, whose values keep
+        changing tick by tick and must not be folded into the state.
+        """
+        sma_short = self._peek_sma(self._short, self._short_sum, close)
+        sma_long = self._peek_sma(self._long, self._long_sum, close)
+
+        atr_value = self._atr
+        if not np.isnan(self._prev_close):
+            tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+            tr_count = self._tr_count + 1
+            if tr_count < self.atr_period:
+                atr_value = np.nan
+            elif tr_count == self.atr_period:
+                atr_value = (self._tr_seed_sum + tr) / self.atr_period
+            else:
+                atr_value = (self._atr * (self.atr_period - 1) + tr) / self.atr_period
+
+        return IndicatorSnapshot(sma_short, sma_long, atr_value)
+
+    @staticmethod
+    def _peek_sma(window: deque, total: float, value: float) -> float:
+        if len(window) == window.maxlen:
+            return (total - window[0] + value) / window.maxlen
+        if len(window) == window.maxlen - 1:
+            return (total + value) / window.maxlen
+        return np.nan
+
+    def warmup(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> IndicatorSnapshot:
+        """
+        Replays a historical window through update() to initialize the state.
+        """
+        snapshot = IndicatorSnapshot(np.nan, np.nan, np.nan)
+        for i in range(len(close)):
+            snapshot = self.update(high[i], low[i], close[i])
+        return snapshot
@@ -1,13 +1,39 @@
+import asyncio
+import logging
+import queue
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 
 from config import ConfigurationManager
 from sentiment import SentimentAnalyzer
-from strategy_engine import StrategyEngine
+from strategy_engine import Signal, StrategyEngine
 from data_handler import DataHandler
 from portfolio_manager import PortfolioManager
 from execution_handler import ExecutionHandler
-from backtester import Backtester
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging(level=logging.INFO) -> QueueListener:
+    """
+    Routes all log records through an in-memory queue drained by a background
+    listener thread. Handlers in data_handler/execution_handler only enqueue,
+    so the trading loop never blocks on a stdout write; the listener thread
+    does the formatting and I/O.
+    """
+    log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    listener = QueueListener(log_queue, stream)
+    listener.start()
+    return listener
+
 
 class Trader:
     """
@@ -18,7 +44,13 @@ class Trader:
         self.data_handler = DataHandler(self.config)
         self.portfolio_manager = PortfolioManager(self.config)
         self.execution_handler = ExecutionHandler(self.config, self.data_handler.exchange)
-        self.sentiment_analyzer = SentimentAnalyzer()
+        # Candle interval in seconds, parsed once; drives both polling
+        # cadence and the sentiment cache lifetime.
+        self._interval_seconds = self.data_handler.exchange.parse_timeframe(self.config.timeframe)
+
+        # One sentiment reading per candle interval is enough; within the
+        # same bar analyze() returns its memoized result.
+        self.sentiment_analyzer = SentimentAnalyzer(ttl_seconds=self._interval_seconds)
         self.strategy_engine = StrategyEngine()
         
         # State tracking
@@ -26,105 +58,234 @@ class Trader:
         self.stop_loss_price = None
         self.entry_price = 0.0
 
+        # Incremental indicator state, keyed by strategy name so switching
+        # strategies invalidates it cleanly.
+        self._indicator_states = {}
+
+        # Strategy-config builders as a dispatch table: adding a strategy
+        # means adding one entry here plus its builder method, with no
+        # if/elif chain to grow.
+        self._strategy_builders = {
+            'SENTIMENT_MOMENTUM': self._build_sentiment_momentum_config,
+            # Future strategies register their builders here
+        }
+
+        # The strategy configuration only depends on ConfigurationManager
+        # values that never change while the bot runs, so build the dict once
+        # here instead of allocating it again on every cycle.
+        self._strategy_config = self._get_strategy_config_from_manager()
+
+    def _build_sentiment_momentum_config(self) -> dict:
+        return {
+            "name": 'SENTIMENT_MOMENTUM',
+            "params": {
+                "short_window": self.config.sm_short_window,
+                "long_window": self.config.sm_long_window,
+                "atr_period": self.config.sm_atr_period,
+                "atr_multiplier": self.config.sm_atr_multiplier
+            }
+        }
+
     def _get_strategy_config_from_manager(self) -> dict:
         """
         Constructs the strategy configuration dictionary based on the active strategy
         set in the ConfigurationManager.
         """
-        strategy_name = self.config.active_strategy
-        if strategy_name == 'SENTIMENT_MOMENTUM':
-            return {
-                "name": strategy_name,
-                "params": {
-                    "short_window": self.config.sm_short_window,
-                    "long_window": self.config.sm_long_window,
-                    "atr_period": self.config.sm_atr_period,
-                    "atr_multiplier": self.config.sm_atr_multiplier
-                }
-            }
-        # Future strategies would be added here as 'elif' blocks
-        else:
-            raise ValueError(f"Strategy '{strategy_name}' not recognized in Trader.")
+        builder = self._strategy_builders.get(self.config.active_strategy)
+        if builder is None:
+            raise ValueError(f"Strategy '{self.config.active_strategy}' not recognized in Trader.")
+        return builder()
 
     def run(self):
         """
         The main trading loop for live or dry-run mode.
+
+        Candles are streamed over a persistent websocket when the exchange
+        supports it, so decisions fire within milliseconds of an update
+        instead of at the next polling interval; otherwise the original
+        REST polling loop is used.
+        """
+        logger.info("Starting Trader application in LIVE/DRY-RUN mode...")
+        if self.config.use_websocket and self.data_handler.supports_streaming():
+            asyncio.run(self._run_stream())
+        else:
+            self._run_polling()
+
+    async def _run_stream(self):
+        """
+        Event-driven loop: one decision pass per websocket tick.
+
+        The stream itself is wrapped in a reconnect loop mirroring the
+        polling path's catch-all: an exchange error or dropped connection
+        surfacing from the generator tears down that stream, waits a minute
+        and opens a fresh one instead of killing the Trader.
         """
-        print("Starting Trader application in LIVE/DRY-RUN mode...")
+        logger.info("Streaming %s candles for %s over websocket...", self.config.timeframe, self.config.symbol)
         while True:
             try:
-                # 1. Fetch latest market data
-                ohlcv_data = self.data_handler.fetch_ohlcv()
-                if ohlcv_data.empty:
-                    time.sleep(60) # Wait a minute if data fetch fails
-                    continue
-
-                # 2. Get the active strategy configuration
-                strategy_config = self._get_strategy_config_from_manager()
-                
-                # 3. Add indicators to data
-                ohlcv_data_with_indicators = self.strategy_engine.add_indicators(ohlcv_data.copy(), strategy_config)
-                latest_candle = ohlcv_data_with_indicators.iloc[-1]
-
-                # 4. Check for stop-loss trigger (highest priority)
-                if self.in_position and latest_candle['close'] <= self.stop_loss_price:
-                    print(f"!!! STOP-LOSS TRIGGERED at ${self.stop_loss_price:.2f} !!!")
-                    exit_price = latest_candle['close']
-                    order_result = self.execution_handler.execute_order('sell', self.portfolio_manager.last_position_size, self.config.symbol)
-                    if order_result:
-                        self.portfolio_manager.update_balance_after_trade(exit_price, self.entry_price, self.portfolio_manager.last_position_size)
-                        self.in_position = False
-                        self.stop_loss_price = None
-                        self.entry_price = 0.0
-                    continue # Restart the loop
-
-                # 5. Get signals and sentiment
-                current_sentiment = self.sentiment_analyzer.analyze()
-                signal_details = self.strategy_engine.generate_signal(ohlcv_data_with_indicators, strategy_config, current_sentiment)
-                signal = signal_details.get('signal')
-
-                # 6. Act on signals
-                if signal == 'buy' and not self.in_position:
-                    self.stop_loss_price = signal_details.get('stop_loss')
-                    if not self.stop_loss_price:
-                        print("Strategy did not provide a stop-loss. Aborting trade.")
+                async for ohlcv_data in self.data_handler.stream_ohlcv():
+                    try:
+                        self._process_cycle(ohlcv_data)
+                    except Exception as e:
+                        logger.error("An unexpected error occurred in the main loop: %s", e)
+            except Exception as e:
+                logger.error("Websocket stream failed: %s. Reconnecting in 60 seconds...", e)
+                await asyncio.sleep(60)
+
+    def _run_polling(self):
+        """
+        REST fallback loop: fetch, decide, sleep until the next candle.
+
+        The OHLCV fetch and the sentiment refresh are independent network
+        calls, so they run overlapped on a small thread pool instead of
+        back-to-back; the cycle then reads the sentiment from its
+        per-candle cache without waiting again.
+        """
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            while True:
+                try:
+                    ohlcv_future = pool.submit(self.data_handler.fetch_ohlcv)
+                    sentiment_future = pool.submit(self.sentiment_analyzer.analyze)
+                    ohlcv_data = ohlcv_future.result()
+                    sentiment_future.result()
+                    if ohlcv_data.empty:
+                        time.sleep(60) # Wait a minute if data fetch fails
                         continue
-                    
-                    current_price = latest_candle['close']
-                    print(f"Buy signal detected. Entry: ${current_price:.2f}, Stop-Loss: ${self.stop_loss_price:.2f}")
-                    
-                    position_size = self.portfolio_manager.calculate_position_size(current_price, self.stop_loss_price)
-                    
-                    if position_size > 0:
-                        order_result = self.execution_handler.execute_order('buy', position_size, self.config.symbol)
-                        if order_result:
-                            self.in_position = True
-                            self.entry_price = current_price
-
-                elif signal == 'sell' and self.in_position:
-                    print("Sell signal detected. Closing position.")
-                    exit_price = latest_candle['close']
-                    order_result = self.execution_handler.execute_order('sell', self.portfolio_manager.last_position_size, self.config.symbol)
-                    if order_result:
-                        self.portfolio_manager.update_balance_after_trade(exit_price, self.entry_price, self.portfolio_manager.last_position_size)
-                        self.in_position = False
-                        self.stop_loss_price = None
-                        self.entry_price = 0.0
-                else:
-                    status = "In Position" if self.in_position else "Awaiting Signal"
-                    print(f"Signal: Hold. Current status: {status}. Portfolio Balance: ${self.portfolio_manager.balance:.2f}")
+                    self._process_cycle(ohlcv_data)
+                except Exception as e:
+                    logger.error("An unexpected error occurred in the main loop: %s", e)
 
-            except Exception as e:
-                print(f"An unexpected error occurred in the main loop: {e}")
+                self._sleep_until_next_candle()
+
+    # Seconds past the candle boundary before polling, so the exchange has
+    # committed the new candle by the time we fetch.
+    POLL_SLACK_SECONDS = 2.0
+
+    def _sleep_until_next_candle(self):
+        """
+        Sleeps to just past the next candle close instead of a flat hour.
+        A fixed sleep drifts relative to the candle boundary, so each poll
+        landed at a random offset of up to a full bar after the close;
+        aligning to the boundary makes every decision run on a fresh candle.
+        Candle closes are wall-clock epoch multiples, so this intentionally
+        uses time.time() rather than the monotonic clock.
+        """
+        now = time.time()
+        next_close = (now // self._interval_seconds + 1) * self._interval_seconds
+        time.sleep(max(next_close - now, 0.0) + self.POLL_SLACK_SECONDS)
 
-            print("\n" + "="*50 + "\n")
-            time.sleep(3600) # Wait for the next candle
+    def _update_indicator_state(self, ohlcv_data, strategy_config):
+        """
+        Maintains a persistent IndicatorState across cycles.
+
+        Only closed candles (every row but the last) are absorbed into the
+        state; in steady state that is one O(1) update per new candle. The
+        still-open candle, whose values change tick by tick, is evaluated
+        with a non-mutating peek. A full warm-up replay happens only on the
+        first cycle, after a data gap, or after a strategy switch.
+        """
+        key = strategy_config["name"]
+        high = ohlcv_data['high'].to_numpy()
+        low = ohlcv_data['low'].to_numpy()
+        close = ohlcv_data['close'].to_numpy()
+        ts = ohlcv_data['timestamp'].to_numpy()
+
+        entry = self._indicator_states.get(key)
+        if entry is not None and len(ts) >= 2 and entry['last_ts'] == ts[-2]:
+            # No candle has closed since the last cycle; nothing to fold in.
+            pass
+        elif entry is not None and len(ts) >= 3 and entry['last_ts'] == ts[-3]:
+            # Exactly one candle closed since the last cycle.
+            self.strategy_engine.update_indicators((high[-2], low[-2], close[-2]), entry['state'])
+            entry['last_ts'] = ts[-2]
+        else:
+            state = self.strategy_engine.make_indicator_state(strategy_config)
+            state.warmup(high[:-1], low[:-1], close[:-1])
+            entry = {'state': state, 'last_ts': ts[-2] if len(ts) >= 2 else None}
+            self._indicator_states[key] = entry
+
+        return entry['state'].peek(high[-1], low[-1], close[-1])
+
+    def _process_cycle(self, ohlcv_data):
+        """
+        One full decision pass over the latest market data: indicators,
+        stop-loss check, signal generation, and order handling. Shared by
+        the websocket and polling loops.
+        """
+        # 1. Get the active strategy configuration (built once in __init__)
+        strategy_config = self._strategy_config
+
+        # 2. Update indicators incrementally: a full recompute over the whole
+        # window happens only on cold start, after that each cycle folds at
+        # most one newly closed candle into the persistent state.
+        snapshot = self._update_indicator_state(ohlcv_data, strategy_config)
+
+        # Pull the latest scalars straight off the column arrays: each
+        # .iloc[-1] / label lookup walks the pandas indexing machinery, while
+        # a [-1] on the ndarray is a plain memory read.
+        last_close = float(ohlcv_data['close'].to_numpy()[-1])
+        last_low = float(ohlcv_data['low'].to_numpy()[-1])
+
+        # 3. Check for stop-loss trigger (highest priority)
+        if self.in_position and last_close <= self.stop_loss_price:
+            logger.info("STOP-LOSS TRIGGERED at $%.2f", self.stop_loss_price)
+            exit_price = last_close
+            order_result = self.execution_handler.execute_order('sell', self.portfolio_manager.last_position_size, self.config.symbol)
+            if order_result:
+                self.portfolio_manager.update_balance_after_trade(exit_price, self.entry_price, self.portfolio_manager.last_position_size)
+                self.in_position = False
+                self.stop_loss_price = None
+                self.entry_price = 0.0
+            return
+
+        # 4. Get signals and sentiment
+        current_sentiment = self.sentiment_analyzer.analyze()
+        signal_details = self.strategy_engine.generate_signal_from_snapshot(
+            snapshot, last_low, strategy_config, current_sentiment
+        )
+        signal = signal_details.get('signal')
+
+        # 5. Act on signals
+        if signal is Signal.BUY and not self.in_position:
+            self.stop_loss_price = signal_details.get('stop_loss')
+            if not self.stop_loss_price:
+                logger.warning("Strategy did not provide a stop-loss. Aborting trade.")
+                return
+
+            current_price = last_close
+            logger.info("Buy signal detected. Entry: $%.2f, Stop-Loss: $%.2f", current_price, self.stop_loss_price)
+
+            position_size = self.portfolio_manager.calculate_position_size(current_price, self.stop_loss_price)
+
+            if position_size > 0:
+                order_result = self.execution_handler.execute_order('buy', position_size, self.config.symbol)
+                if order_result:
+                    self.in_position = True
+                    self.entry_price = current_price
+
+        elif signal is Signal.SELL and self.in_position:
+            logger.info("Sell signal detected. Closing position.")
+            exit_price = last_close
+            order_result = self.execution_handler.execute_order('sell', self.portfolio_manager.last_position_size, self.config.symbol)
+            if order_result:
+                self.portfolio_manager.update_balance_after_trade(exit_price, self.entry_price, self.portfolio_manager.last_position_size)
+                self.in_position = False
+                self.stop_loss_price = None
+                self.entry_price = 0.0
+        else:
+            status = "In Position" if self.in_position else "Awaiting Signal"
+            logger.debug("Signal: Hold. Current status: %s. Portfolio Balance: $%.2f", status, self.portfolio_manager.balance)
 
 if __name__ == '__main__':
+    setup_logging()
     config = ConfigurationManager()
 
     # --- Command-line argument to switch between live trading and backtesting ---
     if len(sys.argv) > 1 and sys.argv[1] == 'backtest':
+        # Imported lazily so live mode does not pay the backtester's
+        # import cost (multiprocessing, numba compilation hooks) at startup.
+        from backtester import Backtester
+
         strategy_name = config.active_strategy
         if strategy_name == 'SENTIMENT_MOMENTUM':
             strategy_conf = {
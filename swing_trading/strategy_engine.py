@@ -1,5 +1,86 @@
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
+from enum import IntEnum
+
+from indicators import IndicatorSnapshot, IndicatorState, atr, sma
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: without it the kernels run as plain Python,
+    # which is slower but produces identical results.
+    def njit(*args, **kwargs):
+        def decorate(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return decorate
+
+
+class Signal(IntEnum):
+    """
+    Trading signal as a plain integer: one CPU compare instead of string
+    hashing per decision, and directly representable as an int8 array for
+    the compiled backtest kernels.
+    """
+    HOLD = 0
+    BUY = 1
+    SELL = 2
+
+
+@njit(cache=True)
+def _run_strategy(high, low, close, short_window, long_window, atr_period,
+                  atr_multiplier, sentiment_is_not_bearish):
+    """
+    The whole SENTIMENT_MOMENTUM pass fused into one sweep over OHLCV:
+    running-sum SMAs, the Wilder ATR recurrence and the signal/stop decision
+    all advance together per candle, so the arrays are read once instead of
+    once per indicator plus once for the signal pass. Emits per-bar signals
+    (Signal values as int8) and stop-loss prices; warm-up bars are HOLD and
+    bars whose ATR has not seeded yet carry a NaN stop, exactly like the
+    separate kernels.
+    """
+    n = close.shape[0]
+    signals = np.zeros(n, dtype=np.int8)
+    stops = np.full(n, np.nan)
+
+    short_sum = 0.0
+    long_sum = 0.0
+    atr_value = np.nan
+    tr_seed_sum = 0.0
+
+    for i in range(n):
+        c = close[i]
+        short_sum += c
+        if i >= short_window:
+            short_sum -= close[i - short_window]
+        long_sum += c
+        if i >= long_window:
+            long_sum -= close[i - long_window]
+
+        # Wilder ATR, seeded with the mean of the first `atr_period` true
+        # ranges (the first candle has no previous close and is skipped).
+        if i > 0:
+            prev_close = close[i - 1]
+            tr = max(high[i] - low[i], abs(high[i] - prev_close), abs(low[i] - prev_close))
+            if i <= atr_period:
+                tr_seed_sum += tr
+                if i == atr_period:
+                    atr_value = tr_seed_sum / atr_period
+            else:
+                atr_value = (atr_value * (atr_period - 1) + tr) / atr_period
+
+        if i >= short_window - 1 and i >= long_window - 1:
+            sma_short = short_sum / short_window
+            sma_long = long_sum / long_window
+            if sma_short > sma_long and sentiment_is_not_bearish:
+                signals[i] = 1  # Signal.BUY
+                stops[i] = low[i] - atr_value * atr_multiplier
+            elif sma_short < sma_long:
+                signals[i] = 2  # Signal.SELL
+
+    return signals, stops
+
 
 class StrategyEngine:
     """
@@ -15,19 +96,36 @@ class StrategyEngine:
         params = strategy_config.get("params", {})
 
         if strategy_name == 'SENTIMENT_MOMENTUM':
-            # Add Simple Moving Averages (SMA)
-            ohlcv_df['SMA_short'] = ta.sma(ohlcv_df['close'], length=params.get('short_window', 10))
-            ohlcv_df['SMA_long'] = ta.sma(ohlcv_df['close'], length=params.get('long_window', 30))
-            # Add Average True Range (ATR) for volatility and stop-loss
-            ohlcv_df['ATR'] = ta.atr(ohlcv_df['high'], ohlcv_df['low'], ohlcv_df['close'], length=params.get('atr_period', 14))
-        
+            close = ohlcv_df['close'].to_numpy()
+            # Attach all indicator columns in one assign() call: each bare
+            # `df[col] = ...` triggers another internal block consolidation,
+            # so a single batched attach copies the frame once instead of
+            # once per indicator.
+            ohlcv_df = ohlcv_df.assign(
+                # Simple Moving Averages (SMA)
+                SMA_short=sma(close, params.get('short_window', 10)),
+                SMA_long=sma(close, params.get('long_window', 30)),
+                # Average True Range (ATR) for volatility and stop-loss
+                ATR=atr(
+                    ohlcv_df['high'].to_numpy(), ohlcv_df['low'].to_numpy(), close,
+                    params.get('atr_period', 14)
+                ),
+            )
+
+            # The NaN prefix is exactly the indicator warm-up, whose length is
+            # known a priori, so slice it off as a view instead of paying
+            # dropna's full NaN scan and row copy. _wilder_smooth produces its
+            # first value at index atr_period, the SMAs at window - 1.
+            warmup = max(params.get('short_window', 10) - 1,
+                         params.get('long_window', 30) - 1,
+                         params.get('atr_period', 14))
+            ohlcv_df = ohlcv_df.iloc[warmup:]
+
         # Future strategies like 'MEAN_REVERSION' would add their indicators here
         # elif strategy_name == 'MEAN_REVERSION':
         #     bbands = ta.bbands(ohlcv_df['close'], length=params.get('bb_window', 20))
         #     ohlcv_df = ohlcv_df.join(bbands)
 
-        ohlcv_df.dropna(inplace=True)
-        
         # --- BUG FIX ---
         # If all rows were dropped, return the empty dataframe to prevent a crash.
         if ohlcv_df.empty:
@@ -36,45 +134,115 @@ class StrategyEngine:
         
         return ohlcv_df
 
+    def make_indicator_state(self, strategy_config: dict) -> IndicatorState:
+        """
+        Builds a fresh incremental indicator state for the given strategy.
+        """
+        params = strategy_config.get("params", {})
+        return IndicatorState(
+            params.get('short_window', 10),
+            params.get('long_window', 30),
+            params.get('atr_period', 14),
+        )
+
+    def update_indicators(self, new_bar, state: IndicatorState) -> IndicatorSnapshot:
+        """
+        Folds one closed (high, low, close) bar into the incremental state
+        and returns the latest indicator values. O(1) per candle, versus
+        add_indicators recomputing every window over the whole frame.
+        """
+        high, low, close = new_bar
+        return state.update(high, low, close)
+
+    def generate_signals_vectorized(self, sma_short: np.ndarray, sma_long: np.ndarray,
+                                    sentiment: dict) -> np.ndarray:
+        """
+        The SENTIMENT_MOMENTUM decision for every bar in one branchless
+        NumPy pass, returned as an int8 array of Signal values. Bars still
+        inside the indicator warm-up compare as False on both conditions and
+        come out HOLD. The backtester feeds the whole array to its compiled
+        simulation; the live loop's per-candle path keeps using
+        generate_signal_from_snapshot.
+        """
+        sentiment_is_not_bearish = sentiment.get('sentiment_score', 0) >= -0.05
+        buy = (sma_short > sma_long) & sentiment_is_not_bearish
+        sell = sma_short < sma_long
+        return np.where(buy, np.int8(Signal.BUY),
+                        np.where(sell, np.int8(Signal.SELL), np.int8(Signal.HOLD)))
+
+    def generate_signals_and_stops(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                                   strategy_config: dict, sentiment: dict) -> tuple:
+        """
+        Runs the fused _run_strategy kernel over raw OHLCV arrays and returns
+        (signals, stop_losses) for every bar. This is the backtest fast path:
+        no indicator columns are materialized, the arrays are swept once.
+        """
+        params = strategy_config.get("params", {})
+        sentiment_is_not_bearish = sentiment.get('sentiment_score', 0) >= -0.05
+        return _run_strategy(
+            high, low, close,
+            params.get('short_window', 10), params.get('long_window', 30),
+            params.get('atr_period', 14), params.get('atr_multiplier', 2.0),
+            sentiment_is_not_bearish,
+        )
+
     def generate_signal(self, ohlcv_df_with_indicators: pd.DataFrame, strategy_config: dict, sentiment: dict) -> dict:
         """
-        Generates a trading signal ('buy', 'sell', 'hold') based on the strategy logic.
+        Generates a trading signal (Signal.BUY/SELL/HOLD) based on the strategy logic.
         """
         # --- BUG FIX ---
         # If the dataframe is empty from the previous step, we can't generate a signal.
         if ohlcv_df_with_indicators.empty:
-            return {"signal": "hold", "stop_loss": None}
+            return {"signal": Signal.HOLD, "stop_loss": None}
         # --- END BUG FIX ---
 
         strategy_name = strategy_config.get("name")
         params = strategy_config.get("params", {})
         latest_candle = ohlcv_df_with_indicators.iloc[-1]
-        
-        signal_details = {"signal": "hold", "stop_loss": None}
 
         if strategy_name == 'SENTIMENT_MOMENTUM':
-            # --- Entry Signal ---
-            # Condition 1: Short-term SMA crosses above long-term SMA (Golden Cross)
-            sma_cross_bullish = latest_candle['SMA_short'] > latest_candle['SMA_long']
-            
-            # Condition 2: Market sentiment is not negative
-            sentiment_is_not_bearish = sentiment.get('sentiment_score', 0) >= -0.05
-            
-            if sma_cross_bullish and sentiment_is_not_bearish:
-                signal_details["signal"] = "buy"
-                # --- Stop-Loss Calculation ---
-                # Place the stop-loss below the recent low, adjusted by ATR
-                atr_value = latest_candle['ATR']
-                stop_loss_price = latest_candle['low'] - (atr_value * params.get('atr_multiplier', 2.0))
-                signal_details["stop_loss"] = stop_loss_price
-                return signal_details
-
-            # --- Exit Signal ---
-            # Condition: Short-term SMA crosses below long-term SMA (Death Cross)
-            sma_cross_bearish = latest_candle['SMA_short'] < latest_candle['SMA_long']
-            if sma_cross_bearish:
-                signal_details["signal"] = "sell"
-                return signal_details
-        
+            snapshot = IndicatorSnapshot(
+                latest_candle['SMA_short'], latest_candle['SMA_long'], latest_candle['ATR']
+            )
+            return self.generate_signal_from_snapshot(
+                snapshot, latest_candle['low'], strategy_config, sentiment
+            )
+
+        return {"signal": Signal.HOLD, "stop_loss": None}
+
+    def generate_signal_from_snapshot(self, snapshot: IndicatorSnapshot, latest_low: float,
+                                      strategy_config: dict, sentiment: dict) -> dict:
+        """
+        Signal decision from the latest indicator values alone. The live loop
+        feeds it incremental snapshots; generate_signal wraps it for callers
+        that still hold a full indicator frame.
+        """
+        params = strategy_config.get("params", {})
+        signal_details = {"signal": Signal.HOLD, "stop_loss": None}
+
+        # Indicators that have not finished warming up cannot signal.
+        if np.isnan(snapshot.sma_short) or np.isnan(snapshot.sma_long):
+            return signal_details
+
+        # --- Entry Signal ---
+        # Condition 1: Short-term SMA crosses above long-term SMA (Golden Cross)
+        sma_cross_bullish = snapshot.sma_short > snapshot.sma_long
+
+        # Condition 2: Market sentiment is not negative
+        sentiment_is_not_bearish = sentiment.get('sentiment_score', 0) >= -0.05
+
+        if sma_cross_bullish and sentiment_is_not_bearish:
+            signal_details["signal"] = Signal.BUY
+            # --- Stop-Loss Calculation ---
+            # Place the stop-loss below the recent low, adjusted by ATR
+            stop_loss_price = latest_low - (snapshot.atr * params.get('atr_multiplier', 2.0))
+            signal_details["stop_loss"] = stop_loss_price
+            return signal_details
+
+        # --- Exit Signal ---
+        # Condition: Short-term SMA crosses below long-term SMA (Death Cross)
+        if snapshot.sma_short < snapshot.sma_long:
+            signal_details["signal"] = Signal.SELL
+
         return signal_details
 